@@ -0,0 +1,381 @@
+# core.py
+# Shared core of the Telegram trading bot: config, price fetching, message formatting,
+# handlers and the scheduler. auto_bot.py is the entrypoint that runs it.
+# Timezone set to Asia/Bangkok (UTC+7)
+
+import os
+import json
+import re
+import datetime
+import asyncio
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from zoneinfo import ZoneInfo  # ✅ Timezone support
+from telegram import Update
+from telegram.ext import Application, MessageHandler, ChatMemberHandler, CommandHandler, filters, ContextTypes
+
+try:
+    import orjson  # ✅ Faster JSON encode/decode when available
+except ImportError:
+    orjson = None
+
+def json_loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def json_dumps(obj):
+    # Always returns UTF-8 bytes, for files opened in binary mode
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+
+# =========================
+# Load bot credentials
+# =========================
+TOKEN = os.getenv("TOKEN")
+# GROUP_ID may hold several comma-separated chat ids for scheduled updates
+GROUP_IDS = [int(x) for x in os.getenv("GROUP_ID", "").split(",") if x.strip()]
+
+if not TOKEN or not GROUP_IDS:
+    raise ValueError("ERROR: TOKEN or GROUP_ID not set in environment variables!")
+
+# =========================
+# File paths
+# =========================
+PRICES_FILE = "prices.json"
+RESPONSES_FILE = "responses.json"
+
+# =========================
+# Ensure JSON files exist
+# =========================
+if not os.path.exists(RESPONSES_FILE):
+    default_responses = {
+        "hello": "👋 Welcome to our Trading Group! Type 'help' for commands.",
+        "help": "📌 Commands:\n- /price: Check live prices\n- deposit: How to deposit funds\n- withdraw: Withdrawal guide",
+        "_welcome": "👋 Welcome {name} to our Trading Group!",
+        "_reload_success": "🔄 Responses reloaded successfully!"
+    }
+    with open(RESPONSES_FILE, "wb") as f:
+        f.write(json_dumps(default_responses))
+
+if not os.path.exists(PRICES_FILE):
+    with open(PRICES_FILE, "wb") as f:
+        f.write(json_dumps({}))
+
+# =========================
+# Market tickers for CoinGecko
+# =========================
+TICKERS = {
+    "BTC": "bitcoin",
+    "ETH": "ethereum",
+    "BNB": "binancecoin",
+    "SOL": "solana",
+    "XAU": "tether-gold"  # Gold token on CoinGecko
+}
+
+COIN_SYMBOLS = {
+    "BTC": "💰",
+    "ETH": "💎",
+    "BNB": "🟡",
+    "SOL": "🟣",
+    "XAU": "🏅"
+}
+
+# =========================
+# Load / Save prices
+# =========================
+def load_last_prices():
+    try:
+        with open(PRICES_FILE, "rb") as f:
+            return json_loads(f.read())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def save_last_prices(prices):
+    try:
+        # Write to a temp file first so a crash never leaves a partial prices.json
+        tmp_path = PRICES_FILE + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(json_dumps(prices))
+        os.replace(tmp_path, PRICES_FILE)
+        return True
+    except Exception as e:
+        print(f"Error saving prices.json: {e}")
+        return False
+
+# Shared price state, created once in main(); every read and write holds `lock`
+@dataclass
+class PriceState:
+    last: dict                                   # last known price per coin
+    saved: dict = field(default_factory=dict)    # what is currently on disk
+    cached: Optional[tuple] = None               # (monotonic expiry, prices)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    @classmethod
+    def load(cls):
+        last = load_last_prices()
+        return cls(last=last, saved=dict(last))
+
+# =========================
+# Load responses
+# =========================
+# Rebuilt on every load: one regex matching any public keyword, plus its replies
+_keyword_re = None
+_kw_to_reply = {}
+
+def load_responses():
+    global _keyword_re, _kw_to_reply
+    try:
+        with open(RESPONSES_FILE, "rb") as f:
+            data = json_loads(f.read())
+    except FileNotFoundError:
+        data = {}
+    # Keys starting with "_" are internal messages, not keywords
+    # Keywords are lowercased to match auto_reply's lowercased text exactly, so
+    # every match is itself a key of _kw_to_reply (first keyword wins on clashes)
+    _kw_to_reply = {}
+    for k, v in data.items():
+        if k and not k.startswith("_"):
+            _kw_to_reply.setdefault(k.lower(), v)
+    if _kw_to_reply:
+        _keyword_re = re.compile("|".join(re.escape(k) for k in _kw_to_reply))
+    else:
+        _keyword_re = None
+    return data
+
+responses = load_responses()
+
+# =========================
+# Fetch live market prices
+# =========================
+COINGECKO_PRICE_URL = "https://api.coingecko.com/api/v3/simple/price"
+
+# Shared session so TLS connections are kept alive between requests
+_session = None
+
+def _get_session():
+    global _session
+    if _session is None:
+        # Imported on first fetch to keep it out of bot start-up
+        import requests
+        _session = requests.Session()
+    return _session
+
+def fetch_usd_prices(coin_ids):
+    params = {"ids": ",".join(coin_ids), "vs_currencies": "usd"}
+    resp = _get_session().get(COINGECKO_PRICE_URL, params=params, timeout=10)
+    # Rate-limit and error pages are not price data; don't decode them as such
+    resp.raise_for_status()
+    # Decode the raw body directly, skipping requests' text/charset detection
+    data = json_loads(resp.content)
+    # Anything but a JSON object is a malformed response, not price data
+    if not isinstance(data, dict):
+        raise ValueError(f"Unexpected CoinGecko response: {type(data).__name__}")
+    return data
+
+def _fetch_one(name, coin_id):
+    try:
+        return name, fetch_usd_prices([coin_id]).get(coin_id)
+    except Exception as e:
+        print(f"Error fetching {name} from CoinGecko: {e}")
+        return name, None
+
+def _fetch_market_prices(state):
+    last_prices = state.last
+    prices = {}
+    data = {}
+    try:
+        # One request for every coin
+        data = fetch_usd_prices(TICKERS.values())
+    except Exception as e:
+        # The whole request failed (e.g. rate limited); retrying each coin
+        # would only send more requests that fail the same way
+        print(f"Error fetching CoinGecko data: {e}")
+        missing = []
+    else:
+        # Retry individually only the coins a successful response left out,
+        # all at once so the round trips overlap
+        missing = [(name, coin_id) for name, coin_id in TICKERS.items() if coin_id not in data]
+    if missing:
+        with ThreadPoolExecutor(max_workers=len(missing)) as ex:
+            for name, coin_data in ex.map(lambda kv: _fetch_one(*kv), missing):
+                if coin_data is not None:
+                    data[TICKERS[name]] = coin_data
+
+    for name, coin_id in TICKERS.items():
+        try:
+            current_price = round(float(data[coin_id]["usd"]), 2)
+        except (KeyError, TypeError, ValueError):
+            # Coin missing from the response, or no USD quote for it
+            prices[name] = (None, " ❓")
+            continue
+        # Arrow logic
+        if name not in last_prices:
+            arrow = " ➡️"
+        else:
+            arrow = " 🔼" if current_price > last_prices[name] else " 🔽" if current_price < last_prices[name] else " ➡️"
+        last_prices[name] = current_price
+        prices[name] = (current_price, arrow)
+
+    if last_prices != state.saved and save_last_prices(last_prices):
+        state.saved = dict(last_prices)
+    return prices
+
+# Short-lived cache so bursts of /price requests share one upstream call
+PRICE_CACHE_TTL = 30  # seconds
+PRICE_FAILURE_TTL = 5  # seconds; used when no coin could be priced
+
+def get_market_prices(state, force_refresh=False):
+    with state.lock:
+        if (not force_refresh and state.cached is not None
+                and time.monotonic() < state.cached[0]):
+            return state.cached[1]
+        prices = _fetch_market_prices(state)
+        # Keep a total failure (timeout, 429) only briefly: bursts still share
+        # one upstream call, but an outage isn't frozen in for the full TTL
+        priced = any(price is not None for price, _ in prices.values())
+        ttl = PRICE_CACHE_TTL if priced else PRICE_FAILURE_TTL
+        state.cached = (time.monotonic() + ttl, prices)
+        return prices
+
+# =========================
+# Format message with Bangkok time
+# =========================
+BANGKOK_TZ = ZoneInfo("Asia/Bangkok")
+
+# Reuse the formatted timestamp within the same second (helps bursts of /price)
+CACHE_TIMESTAMP = True
+_fmt_cache = (0, "")  # (epoch second, formatted timestamp)
+
+def _market_timestamp():
+    global _fmt_cache
+    sec = int(time.time())
+    if CACHE_TIMESTAMP and sec == _fmt_cache[0]:
+        return _fmt_cache[1]
+    now = datetime.datetime.fromtimestamp(sec, BANGKOK_TZ)  # ✅ force UTC+7
+    timestamp = now.strftime("%Y-%m-%d %H:%M:%S")
+    _fmt_cache = (sec, timestamp)
+    return timestamp
+
+def format_market_message(prices, title="💹 Live Market Prices"):
+    timestamp = _market_timestamp()
+    parts = [f"{title} ({timestamp}):", ""]
+    for coin, (price, arrow) in prices.items():
+        if price is not None:
+            symbol = COIN_SYMBOLS.get(coin, "•")
+            parts.append(f"{symbol} {coin}/USD: ${price:,.2f}{arrow}")
+        else:
+            parts.append(f"⚠️ {coin}/USD: N/A{arrow}")
+    parts.append("")
+    parts.append("Trade Smart, Grow Together 💸")
+    return "\n".join(parts)
+
+# =========================
+# Scheduled updates (Bangkok time)
+# =========================
+async def send_market_update(app: Application):
+    state = app.bot_data["price_state"]
+    prices = await asyncio.to_thread(get_market_prices, state, force_refresh=True)
+    message = format_market_message(prices, "📊 Market Update")
+    # Send to every group concurrently; one failing chat doesn't stop the rest
+    results = await asyncio.gather(
+        *(app.bot.send_message(chat_id=g, text=message) for g in GROUP_IDS),
+        return_exceptions=True
+    )
+    for chat_id, result in zip(GROUP_IDS, results):
+        if isinstance(result, Exception):
+            print(f"Error sending market update to {chat_id}: {result}")
+
+def _next_target_datetime(target_times, now):
+    for hour, minute in sorted(target_times):
+        candidate = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if candidate > now:
+            return candidate
+    hour, minute = min(target_times)
+    tomorrow = now + datetime.timedelta(days=1)
+    return tomorrow.replace(hour=hour, minute=minute, second=0, microsecond=0)
+
+async def schedule_updates(app: Application):
+    target_times = [(9, 0), (12, 0), (19, 0)]  # Bangkok times
+    tz = BANGKOK_TZ
+    last_fired = None
+    while True:
+        now = datetime.datetime.now(tz)
+        # Always move past the slot that just fired, so waking a little early
+        # or the clock stepping back can't post the same update twice
+        after = now if last_fired is None else max(now, last_fired)
+        next_dt = _next_target_datetime(target_times, after)
+        # Sleep straight to the next target instead of polling the clock. asyncio.sleep
+        # times this on the loop's monotonic clock, so wall-clock jumps can't shift it
+        delay = (next_dt - now).total_seconds()
+        await asyncio.sleep(max(0, delay))
+        await send_market_update(app)
+        last_fired = next_dt
+
+# =========================
+# Handlers
+# =========================
+MAX_MESSAGE_LENGTH = 4096  # Telegram's limit; anything longer is not a real chat message
+
+async def handle_price_request(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    state = context.bot_data["price_state"]
+    prices = await asyncio.to_thread(get_market_prices, state)
+    message = format_market_message(prices)
+    await update.message.reply_text(message)
+
+async def auto_reply(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if update.message is None or update.message.text is None:
+        return
+    text = update.message.text
+    if len(text) > MAX_MESSAGE_LENGTH:
+        return
+    msg = text.lower()
+    # "/price" itself is routed by its CommandHandler; this catches free-form text
+    if "price" in msg:
+        await handle_price_request(update, context)
+        return
+    if _keyword_re is None:
+        return
+    match = _keyword_re.search(msg)
+    if match:
+        await update.message.reply_text(_kw_to_reply[match.group(0)])
+
+async def welcome(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    result = update.chat_member
+    new_status = result.new_chat_member.status
+    old_status = result.old_chat_member.status
+    if old_status in ("left", "kicked") and new_status == "member":
+        new_user = result.new_chat_member.user
+        welcome_message = responses.get("_welcome", "👋 Welcome {name}!")
+        welcome_message = welcome_message.replace("{name}", new_user.mention_html())
+        await context.bot.send_message(
+            chat_id=update.chat_member.chat.id,
+            text=welcome_message,
+            parse_mode="HTML"
+        )
+
+async def reload_responses(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    global responses
+    responses = load_responses()
+    await update.message.reply_text(responses.get("_reload_success", "Reloaded!"))
+
+# =========================
+# Application
+# =========================
+def build_application():
+    app = Application.builder().token(TOKEN).build()
+    app.bot_data["price_state"] = PriceState.load()
+    app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, auto_reply))
+    app.add_handler(ChatMemberHandler(welcome, ChatMemberHandler.CHAT_MEMBER))
+    app.add_handler(CommandHandler("price", handle_price_request))
+    app.add_handler(CommandHandler("reload", reload_responses))
+
+    async def on_startup(_):
+        asyncio.create_task(schedule_updates(app))
+
+    app.post_init = on_startup
+    return app